@@ -0,0 +1,71 @@
+# batch.py — headless parameter sweep over the slider bounds, run in parallel
+import argparse
+import itertools
+from multiprocessing import Pool, cpu_count
+
+import pandas as pd
+
+from model import BuildingModel
+from params import model_params
+
+
+def sweep_grid():
+    """Cartesian product of every slider's (min, max) and every checkbox's (False, True)."""
+    names, levels = [], []
+    for name, spec in model_params.items():
+        names.append(name)
+        if spec["type"] == "checkbox":
+            levels.append((False, True))
+        else:
+            levels.append((spec["min"], spec["max"]))
+    return [dict(zip(names, combo)) for combo in itertools.product(*levels)]
+
+
+def run_one(args):
+    """Run one BuildingModel for `sim_time` sim-seconds; return its KPI time series.
+
+    KPIs are sampled every `interval` sim-seconds, so rows line up across runs.
+    """
+    run_id, params, sim_time, interval, seed = args
+    model = BuildingModel(seed=seed, **params)
+    rows = []
+    while model.env.now < sim_time:
+        model.run_for(min(interval, sim_time - model.env.now))
+        rows.append({"Time": model.env.now, **model.kpis()})
+
+    df = pd.DataFrame(rows)
+    df["RunId"] = run_id
+    for name, value in params.items():
+        df[name] = value
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel parameter sweep of BuildingModel")
+    parser.add_argument("--sim-time", type=float, default=3600.0, help="sim-seconds per run")
+    parser.add_argument("--interval", type=float, default=60.0, help="sim-seconds between samples")
+    parser.add_argument("--processes", type=int, default=cpu_count())
+    parser.add_argument("--seed", type=int, default=None, help="base seed; run i uses seed + i")
+    parser.add_argument("--output", default="batch_results.csv")
+    args = parser.parse_args()
+    if args.sim_time <= 0:
+        parser.error("--sim-time must be positive")
+    if args.interval <= 0:
+        parser.error("--interval must be positive")
+
+    grid = sweep_grid()
+    jobs = [
+        (i, params, args.sim_time, args.interval, None if args.seed is None else args.seed + i)
+        for i, params in enumerate(grid)
+    ]
+
+    with Pool(args.processes) as pool:
+        frames = pool.map(run_one, jobs)
+
+    results = pd.concat(frames, ignore_index=True)
+    results.to_csv(args.output, index=False)
+    print(f"{len(grid)} runs, {len(results)} rows -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
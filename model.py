@@ -1,145 +1,225 @@
 # model.py — Mesa 2.x compatible elevator ABM + SimPy
 from mesa import Agent, Model
-from mesa.time import RandomActivation
 from mesa.datacollection import DataCollector
+from collections import deque
 import simpy
 import numpy as np
-import random
-
-
-class RiderAgent(Agent):
-    def __init__(self, unique_id, model, origin, dest):
-        super().__init__(unique_id, model)
-        self.origin = origin
-        self.dest = dest
-
-        self.wait_start = None
-        self.wait_time = 0.0
-        self.travel_time = 0.0
-        self.journey_time = 0.0
-        self.enter_time = None
-        self.exit_time = None
-
-        self.satisfaction = 0.0
-        self.perceived_quality = 0.0
-        self.comfort = 0.0
-
-    def step(self):
-        """
-        First step: rider appears in lobby and starts waiting.
-        After that, step() is a no-op.
-        """
-        if self.wait_start is None:
-            self.wait_start = self.model.env.now
-            self.model.lobby_waiting[self.origin].append(self)
+import pandas as pd
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; kernels then fall back to np.clip
+    njit = None
+
+# Number of random draws generated per refill of the model's RNG buffers
+RNG_BATCH = 4096
+
+
+# Riders are rows in these NumPy columns (struct-of-arrays) rather than Agent objects
+RIDER_COLUMNS = (
+    ("origin", np.int32),
+    ("dest", np.int32),
+    ("wait_start", np.float64),
+    ("enter_time", np.float64),
+    ("exit_time", np.float64),
+    ("wait_time", np.float64),
+    ("travel_time", np.float64),
+    ("journey_time", np.float64),
+    ("satisfaction", np.float64),
+    ("comfort", np.float64),
+)
+
+
+# Compiled kernels clamp with scalar min/max (minsd/maxsd, no branches); the
+# NumPy fallbacks do the same with one vectorised np.clip per call.
+if njit is not None:
+    @njit(cache=True)
+    def _compute_comfort(idx, crowd, vib, noise, noise_buf, comfort):
+        """Comfort of riders `idx` from crowding, vibration and noise, clamped to [1, 5]."""
+        base = 5.0 - crowd * 3.0 - vib * 1.5 - noise / 20.0
+        for i in range(idx.shape[0]):
+            comfort[idx[i]] = min(5.0, max(1.0, base + noise_buf[i]))
+
+    @njit(cache=True)
+    def _compute_sat(idx, wait, sat):
+        """Simple satisfaction model for riders `idx`: penalise long waits, clamped to [1, 5]."""
+        for i in range(idx.shape[0]):
+            r = idx[i]
+            sat[r] = min(5.0, max(1.0, 5.0 - wait[r] / 60.0))
+else:
+    def _compute_comfort(idx, crowd, vib, noise, noise_buf, comfort):
+        """Comfort of riders `idx` from crowding, vibration and noise, clamped to [1, 5]."""
+        base = 5.0 - crowd * 3.0 - vib * 1.5 - noise / 20.0
+        comfort[idx] = np.clip(base + noise_buf, 1.0, 5.0)
+
+    def _compute_sat(idx, wait, sat):
+        """Simple satisfaction model for riders `idx`: penalise long waits, clamped to [1, 5]."""
+        sat[idx] = np.clip(5.0 - wait[idx] / 60.0, 1.0, 5.0)
 
 
 class ElevatorAgent(Agent):
-    def __init__(self, unique_id, model, capacity, speed, vibration, noise):
+    def __init__(self, unique_id, model, slot, capacity, speed, vibration, noise):
         super().__init__(unique_id, model)
+        self.slot = slot                # index into the model's per-elevator arrays
         self.capacity = capacity
         self.speed = speed              # m/s
         self.floor_height = 3.5         # meters
         self.current_floor = 0
-        self.passengers = []
+        self.passengers = []            # rider row indices
+        self._dest_mask = 0             # bit f set <=> some passenger is bound for floor f
+        self._n_published = 0           # passenger count last written to model._crowd
         self.door_time = model.door_time
         self.reliability = 0.97
 
         self.vibration_level = vibration
         self.noise_level = noise
 
-        # SimPy queue of floor requests
-        self.request_store = simpy.Store(self.model.env)
+        # Travel + door time between every pair of floors (speed and height are fixed
+        # for a run); nested lists because scalar lookups are cheaper than on ndarrays
+        floors = np.arange(model.N_floors)
+        travel = np.abs(floors[:, None] - floors[None, :]) * self.floor_height / self.speed
+        self._stop_time = (travel + self.door_time).tolist()
+
+        # Pre-drawn reliability delays: 0, or 10-30 s with probability 1 - reliability
+        self._rel_buf = None
+        self._rel_idx = RNG_BATCH
+
+        # Pre-drawn N(0, 0.5) comfort noise, consumed one value per passenger
+        self._noise_buf = np.empty(0)
+        self._noise_idx = 0
+
+        # FIFO of floor requests; _req_ev is the wake-up event while run() is idle
+        self._reqs = deque()
+        self._req_ev = None
 
         # Start the elevator's main SimPy process
         self.model.env.process(self.run())
 
-    def step(self):
-        """
-        Scheduler calls this every Mesa tick.
-        Elevator behaviour itself is handled by the SimPy process in run().
-        """
-        pass
+    def visit(self, floor):
+        """SimPy process: move elevator to given floor and cycle the doors.
 
-    def move_to(self, floor):
-        """SimPy process: move elevator to given floor."""
-        distance = abs(floor - self.current_floor) * self.floor_height
-        t = distance / self.speed
+        Travel and door time are a single timeout, so each stop costs one
+        event in the SimPy queue instead of two.
+        """
+        t = self._stop_time[self.current_floor][floor]
 
         # Reliability-related occasional extra delay
-        if random.random() > self.reliability:
-            t += random.uniform(10, 30)
+        if self._rel_idx == RNG_BATCH:
+            self._refill_reliability()
+        t += self._rel_buf[self._rel_idx]
+        self._rel_idx += 1
 
         yield self.model.env.timeout(t)
         self.current_floor = floor
 
+    def _refill_reliability(self):
+        """Draw the next batch of reliability delays in bulk."""
+        rng = self.model.rng
+        fault = rng.random(RNG_BATCH) > self.reliability
+        self._rel_buf = np.where(fault, rng.uniform(10, 30, RNG_BATCH), 0.0).tolist()
+        self._rel_idx = 0
+
     def _unload(self, floor):
         """Unload passengers whose destination is this floor and compute metrics."""
-        exiting = [p for p in self.passengers if p.dest == floor]
-
-        for p in exiting:
-            now = self.model.env.now
-            p.exit_time = now
-            p.travel_time = now - p.enter_time
-            p.wait_time = p.enter_time - p.wait_start
-            p.journey_time = now - p.wait_start
-
-            # Simple satisfaction model: penalise long waits
-            base_sat = 5.0 - (p.wait_time / 60.0)
-            p.satisfaction = max(1.0, min(5.0, base_sat))
-            p.perceived_quality = p.comfort
-
-            self.passengers.remove(p)
-            self.model.exited_riders.append(p)
+        bit = 1 << floor
+        if not self._dest_mask & bit:
+            return
+        self._dest_mask &= ~bit
+
+        cols = self.model.rider_cols
+        pax = np.array(self.passengers, dtype=np.intp)
+        leaving = cols["dest"][pax] == floor
+        exiting = pax[leaving]
+
+        now = self.model.env.now
+        enter = cols["enter_time"][exiting]
+        start = cols["wait_start"][exiting]
+        cols["exit_time"][exiting] = now
+        cols["travel_time"][exiting] = now - enter
+        cols["wait_time"][exiting] = enter - start
+        cols["journey_time"][exiting] = now - start
+
+        _compute_sat(exiting, cols["wait_time"], cols["satisfaction"])
+        self.model._record_exits(exiting)
+
+        # Single filtering pass instead of one list.remove() per exiting rider
+        self.passengers = pax[~leaving].tolist()
+        self._update_crowding()
+
+    def _update_crowding(self):
+        """Publish the current load factor to the model's crowding array."""
+        n = len(self.passengers)
+        if n != self._n_published:
+            self._n_published = n
+            self.model._crowd[self.slot] = n / self.capacity
+            self.model._kpis_dirty = True
 
     def _update_comfort(self):
         """Update comfort based on crowding, vibration, and noise."""
         if not self.passengers:
             return
 
-        crowd = len(self.passengers) / self.capacity
-        comfort = 5 - (crowd * 3) - (self.vibration_level * 1.5) - (self.noise_level / 20.0)
-
-        for p in self.passengers:
-            p.comfort = max(1.0, min(5.0, comfort + random.gauss(0, 0.5)))
+        n = len(self.passengers)
+        crowd = n / self.capacity
+        if self._noise_idx + n > len(self._noise_buf):
+            self._noise_buf = self.model.rng.normal(0.0, 0.5, max(RNG_BATCH, n))
+            self._noise_idx = 0
+        noise_buf = self._noise_buf[self._noise_idx:self._noise_idx + n]
+        self._noise_idx += n
+        _compute_comfort(
+            np.array(self.passengers, dtype=np.intp),
+            crowd,
+            float(self.vibration_level),
+            float(self.noise_level),
+            noise_buf,
+            self.model.rider_cols["comfort"],
+        )
 
     def run(self):
         """Main SimPy loop: wait for floor requests and serve them in sequence."""
         while True:
-            floor = yield self.request_store.get()
+            if not self._reqs:
+                self._req_ev = self.model.env.event()
+                yield self._req_ev
+                self._req_ev = None
+            floor = self._reqs.popleft()
 
             # Move to the requested floor
-            yield from self.move_to(floor)
-            yield self.model.env.timeout(self.door_time)
+            yield from self.visit(floor)
 
             # Unload
             self._unload(floor)
 
-            # Load new riders
-            waiting = list(self.model.lobby_waiting[floor])
+            # Load new riders (FIFO) straight off the front of the lobby deque
+            lobby = self.model.lobby_waiting[floor]
             space = self.capacity - len(self.passengers)
-            to_load = waiting[:space]
+            to_load = [lobby.popleft() for _ in range(min(space, len(lobby)))]
 
-            for r in to_load:
-                r.enter_time = self.model.env.now
-                self.passengers.append(r)
-                self.model.lobby_waiting[floor].remove(r)
+            cols = self.model.rider_cols
+            cols["enter_time"][to_load] = self.model.env.now
+            for d in cols["dest"][to_load].tolist():
+                self._dest_mask |= 1 << d
+            self.passengers.extend(to_load)
 
+            self._update_crowding()
             self._update_comfort()
 
             # Now serve destinations of current passengers (simple up/down sweep)
-            dests = sorted({p.dest for p in self.passengers})
-            for d in dests:
-                if d == floor:
-                    continue
-                yield from self.move_to(d)
-                yield self.model.env.timeout(self.door_time)
+            # Destinations are visited in ascending order by peeling the lowest set bit
+            mask = self._dest_mask & ~(1 << floor)
+            while mask:
+                low = mask & -mask
+                mask ^= low
+                d = low.bit_length() - 1
+                yield from self.visit(d)
                 self._unload(d)
                 self._update_comfort()
 
     def request(self, floor):
         """External call: request the elevator to visit a floor."""
-        self.request_store.put(floor)
+        self._reqs.append(floor)
+        if self._req_ev is not None and not self._req_ev.triggered:
+            self._req_ev.succeed()
 
 
 class BuildingModel(Model):
@@ -154,11 +234,11 @@ class BuildingModel(Model):
         vibration=1.01,
         noise=55.9,
         speed=3.0,
+        seed=None,
     ):
         super().__init__()
 
-        # Mesa scheduler
-        self.schedule = RandomActivation(self)
+        # No Mesa scheduler: all agent behaviour runs as SimPy processes
 
         self.N_floors = N_floors
         self.num_elevators = N_elevators
@@ -172,76 +252,166 @@ class BuildingModel(Model):
         self.env = simpy.Environment()
         self.current_time = 0.0
 
-        # State collections
-        self.lobby_waiting = {f: [] for f in range(N_floors)}
-        self.exited_riders = []
+        # Single PCG64 generator for all model randomness; arrival draws are
+        # taken from batched buffers
+        self.rng = np.random.default_rng(seed)
+        self._exp_buf = np.empty(RNG_BATCH, dtype=np.float64)
+        self._exp_idx = RNG_BATCH
+        self._origin_buf = None
+        self._dest_offset_buf = None
+        self._elevator_buf = None
+        self._arrival_idx = RNG_BATCH
+
+        # State collections; lobbies hold rider row indices
+        self.lobby_waiting = {f: deque() for f in range(N_floors)}
+
+        # Rider columns, grown by doubling; rows [0, _n_riders) are allocated
+        self._n_riders = 0
+        self.rider_cols = {name: np.zeros(65536, dtype=dtype) for name, dtype in RIDER_COLUMNS}
+
+        # Exited riders in exit order (row index and wait time); grown by doubling
+        self._n_exited = 0
+        self._exited = np.empty(65536, dtype=np.intp)     # rider rows in exit order
+        self._wait = np.empty(65536, dtype=np.float32)
+
+        # Running totals so mean KPIs are O(1) per collect
+        self._sum_wait = 0.0
+        self._sum_journey = 0.0
+        self._sum_sat = 0.0
+
+        # Current load factor of each elevator, indexed by ElevatorAgent.slot
+        self._crowd = np.zeros(N_elevators, dtype=np.float32)
+
+        # Set whenever a reporter's value may have changed since the last collect
+        self._kpis_dirty = True
 
         # Create elevators (give each a unique_id via self.next_id())
-        for _ in range(N_elevators):
-            e = ElevatorAgent(self.next_id(), self, capacity, speed, vibration, noise)
-            self.schedule.add(e)
+        self.elevators = []
+        for slot in range(N_elevators):
+            e = ElevatorAgent(self.next_id(), self, slot, capacity, speed, vibration, noise)
+            self.elevators.append(e)
 
         # Data collector
         self.datacollector = DataCollector(
             model_reporters={
-                "Avg_Wait_Time": lambda m: np.mean([r.wait_time for r in m.exited_riders])
-                if m.exited_riders else 0,
-                "Avg_Journey_Time": lambda m: np.mean(
-                    [r.journey_time for r in m.exited_riders]
-                ) if m.exited_riders else 0,
-                "Avg_Satisfaction": lambda m: np.mean(
-                    [r.satisfaction for r in m.exited_riders]
-                ) if m.exited_riders else 0,
-                "Crowding": lambda m: np.mean(
-                    [
-                        len(e.passengers) / e.capacity
-                        for e in m.schedule.agents
-                        if isinstance(e, ElevatorAgent)
-                    ]
-                )
-                if any(isinstance(e, ElevatorAgent) for e in m.schedule.agents)
-                else 0,
+                "Avg_Wait_Time": lambda m: m._sum_wait / m._n_exited
+                if m._n_exited else 0,
+                "Avg_Journey_Time": lambda m: m._sum_journey / m._n_exited
+                if m._n_exited else 0,
+                "Avg_Satisfaction": lambda m: m._sum_sat / m._n_exited
+                if m._n_exited else 0,
+                "Crowding": lambda m: float(m._crowd.mean()) if len(m._crowd) else 0,
             }
         )
 
         # Start rider generation process in SimPy
         self.env.process(self.generate_riders())
 
+    def _alloc_rider(self, origin, dest):
+        """Create a rider row waiting in the `origin` lobby; returns its index."""
+        rid = self._n_riders
+        cols = self.rider_cols
+        if rid == len(cols["origin"]):
+            for name, col in cols.items():
+                cols[name] = np.concatenate([col, np.zeros_like(col)])
+
+        cols["origin"][rid] = origin
+        cols["dest"][rid] = dest
+        cols["wait_start"][rid] = self.env.now
+        self._n_riders = rid + 1
+
+        self.lobby_waiting[origin].append(rid)
+        return rid
+
+    def _record_exits(self, idx):
+        """Record exited riders and add their KPIs to the running totals."""
+        n = self._n_exited
+        end = n + len(idx)
+        if end > len(self._wait):
+            size = max(2 * len(self._wait), end)
+            self._exited = np.resize(self._exited, size)
+            self._wait = np.resize(self._wait, size)
+
+        cols = self.rider_cols
+        wait = cols["wait_time"][idx]
+        journey = cols["journey_time"][idx]
+        sat = cols["satisfaction"][idx]
+        self._exited[n:end] = idx
+        self._wait[n:end] = wait
+        self._n_exited = end
+
+        self._sum_wait += float(wait.sum())
+        self._sum_journey += float(journey.sum())
+        self._sum_sat += float(sat.sum())
+        self._kpis_dirty = True
+
+    def exited_df(self):
+        """All rider columns for exited riders, one row per rider in exit order."""
+        rows = self._exited[:self._n_exited]
+        return pd.DataFrame({name: col[rows] for name, col in self.rider_cols.items()})
+
+    def wait_quantiles(self, qs):
+        """Quantiles `qs` of exited riders' wait times (0 if nobody has exited yet)."""
+        if not self._n_exited:
+            return np.zeros(np.shape(qs))
+        return np.quantile(self._wait[:self._n_exited], qs)
+
     def generate_riders(self):
         """Continuous rider arrival process (SimPy)."""
         while True:
+            if self._exp_idx == RNG_BATCH:
+                self.rng.standard_exponential(out=self._exp_buf)
+                self._exp_idx = 0
             rate = 12 if self.peak_hour else 45
-            inter_arrival = np.random.exponential(rate)
+            inter_arrival = rate * self._exp_buf[self._exp_idx]
+            self._exp_idx += 1
             yield self.env.timeout(inter_arrival)
 
-            origin = random.choice(range(self.N_floors))
-            dest = random.choice([f for f in range(self.N_floors) if f != origin])
+            if self._arrival_idx == RNG_BATCH:
+                self._origin_buf = self.rng.integers(0, self.N_floors, size=RNG_BATCH)
+                self._dest_offset_buf = self.rng.integers(0, self.N_floors - 1, size=RNG_BATCH)
+                self._elevator_buf = self.rng.integers(
+                    0, max(1, len(self.elevators)), size=RNG_BATCH
+                )
+                self._arrival_idx = 0
+            i = self._arrival_idx
+            self._arrival_idx += 1
+            origin = int(self._origin_buf[i])
+            elevator = int(self._elevator_buf[i])
 
-            # Create rider and register with the Mesa scheduler
-            r = RiderAgent(self.next_id(), self, origin, dest)
-            self.schedule.add(r)
+            # Uniform over every floor except the origin, without building a list
+            dest = (origin + 1 + int(self._dest_offset_buf[i])) % self.N_floors
 
-            # Immediately put them in the lobby (start waiting)
-            r.step()
+            # Create rider row; it is placed in the lobby and starts waiting
+            self._alloc_rider(origin, dest)
 
             # Call a random elevator
-            elevators = [a for a in self.schedule.agents if isinstance(a, ElevatorAgent)]
-            if elevators:
-                random.choice(elevators).request(origin)
+            if self.elevators:
+                self.elevators[elevator].request(origin)
 
     def step(self):
         """
         One simulation step:
-        - Advance SimPy to the next event
-        - Step all Mesa agents (mostly a no-op except first rider step)
-        - Collect metrics
+        - Advance SimPy to the next event (elevators and arrivals are SimPy processes)
+        - Collect metrics, but only if a rider exited or crowding changed
         """
         # Advance the SimPy environment one event
         self.env.step()
         self.current_time = self.env.now
 
-        # Step Mesa agents
-        self.schedule.step()
+        # Collect KPIs; most events (moves, door timeouts) leave them unchanged
+        if self._kpis_dirty:
+            self.datacollector.collect(self)
+            self._kpis_dirty = False
+
+    def run_for(self, duration):
+        """Advance the SimPy clock by `duration` sim-seconds without per-event KPI collection."""
+        self.env.run(until=self.env.now + duration)
+        self.current_time = self.env.now
 
-        # Collect KPIs
-        self.datacollector.collect(self)
+    def kpis(self):
+        """Current value of every model reporter, keyed by reporter name."""
+        return {
+            name: reporter(self)
+            for name, reporter in self.datacollector.model_reporters.items()
+        }
@@ -0,0 +1,14 @@
+# params.py — interactive parameter ranges shared by server.py and batch.py
+
+# INTERACTIVE PARAMETERS — rendered as sliders/checkboxes by index.html, swept by batch.py
+model_params = {
+    "N_floors": {"type": "slider", "label": "Number of Floors", "value": 6, "min": 2, "max": 30, "step": 1},
+    "N_elevators": {"type": "slider", "label": "Number of Elevators", "value": 2, "min": 1, "max": 8, "step": 1},
+    "peak_hour": {"type": "checkbox", "label": "Peak Hour Demand (High Arrival Rate)", "value": True},
+    "backup_power": {"type": "checkbox", "label": "Backup Power Available", "value": True},
+    "door_time": {"type": "slider", "label": "Door Open/Close Time (s)", "value": 10.6, "min": 5.0, "max": 25.0, "step": 0.5},
+    "capacity": {"type": "slider", "label": "Elevator Capacity (persons)", "value": 16, "min": 8, "max": 30, "step": 1},
+    "vibration": {"type": "slider", "label": "Vibration Level", "value": 1.01, "min": 0.5, "max": 3.0, "step": 0.1},
+    "noise": {"type": "slider", "label": "Cabin Noise (dB)", "value": 55.9, "min": 40.0, "max": 80.0, "step": 1.0},
+    "speed": {"type": "slider", "label": "Elevator Speed (m/s)", "value": 3.0, "min": 1.0, "max": 6.0, "step": 0.5},
+}
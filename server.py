@@ -1,41 +1,163 @@
 import os
-# server.py — FULLY INTERACTIVE (sliders + checkboxes) for Render deployment
-from mesa.visualization import ModularServer
-from mesa.visualization.modules import ChartModule
-from mesa.visualization.UserParam import Slider, Checkbox
+# server.py — lightweight Tornado + Server-Sent Events front-end for Render deployment
+import asyncio
+import json
+import threading
+import time
+
+import tornado.ioloop
+import tornado.queues
+import tornado.web
+from tornado.iostream import StreamClosedError
+
 from model import BuildingModel
+from params import model_params
+
+TITLE = "VTS Hybrid ABM-DES — Interactive Simulation (Rowland PhD)"
+
+# Sim-seconds advanced between chart points, and wall-clock pause between them
+SIM_SECONDS_PER_FRAME = 60.0
+FRAME_INTERVAL = 0.1
+
+
+def default_params():
+    return {name: p["value"] for name, p in model_params.items()}
+
+
+def coerce_params(raw):
+    """Clamp/convert user-supplied values to the declared parameter ranges.
+
+    Raises ValueError/TypeError if `raw` is not an object, a slider value is not
+    numeric, or a checkbox value is not a JSON boolean.
+    """
+    if not isinstance(raw, dict):
+        raise TypeError("parameters must be a JSON object")
+    params = default_params()
+    for name, value in raw.items():
+        spec = model_params.get(name)
+        if spec is None:
+            continue
+        if spec["type"] == "checkbox":
+            if not isinstance(value, bool):
+                raise TypeError(f"{name} must be true or false")
+            params[name] = value
+        else:
+            cast = int if isinstance(spec["step"], int) else float
+            params[name] = cast(min(spec["max"], max(spec["min"], float(value))))
+    return params
+
+
+class SimulationRunner:
+    """Steps a BuildingModel in a background thread and broadcasts KPI frames."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.subscribers = set()
+        self.running = True
+        self._lock = threading.Lock()
+        self._model = BuildingModel(**default_params())
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def reset(self, params):
+        model = BuildingModel(**params)
+        with self._lock:
+            self._model = model
+            self.loop.add_callback(self._broadcast, json.dumps({"reset": True}))
+
+    def _run(self):
+        while True:
+            if self.running:
+                with self._lock:
+                    model = self._model
+                    model.run_for(SIM_SECONDS_PER_FRAME)
+                    frame = {"t": model.current_time, **model.kpis()}
+                    # Queue under the lock so no old-model frame can follow a reset
+                    self.loop.add_callback(self._broadcast, json.dumps(frame))
+            time.sleep(FRAME_INTERVAL)
+
+    def _broadcast(self, message):
+        # Runs on the IOLoop thread; slow clients drop frames rather than buffer them
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(message)
+            except tornado.queues.QueueFull:
+                pass
+
+
+class IndexHandler(tornado.web.RequestHandler):
+    def get(self):
+        self.render("index.html", title=TITLE)
+
+
+class ParamsHandler(tornado.web.RequestHandler):
+    def get(self):
+        self.write({"params": model_params, "running": self.application.runner.running})
+
+
+class ControlHandler(tornado.web.RequestHandler):
+    def post(self, action):
+        runner = self.application.runner
+        if action == "reset":
+            try:
+                params = coerce_params(json.loads(self.request.body or b"{}"))
+            except (ValueError, TypeError) as exc:
+                raise tornado.web.HTTPError(400, reason=str(exc))
+            runner.reset(params)
+        elif action == "pause":
+            runner.running = False
+        elif action == "resume":
+            runner.running = True
+        else:
+            raise tornado.web.HTTPError(404)
+        self.write({"running": runner.running})
+
+
+class EventsHandler(tornado.web.RequestHandler):
+    async def get(self):
+        self.set_header("Content-Type", "text/event-stream")
+        self.set_header("Cache-Control", "no-cache")
+
+        queue = tornado.queues.Queue(maxsize=100)
+        subscribers = self.application.runner.subscribers
+        subscribers.add(queue)
+        try:
+            while True:
+                message = await queue.get()
+                self.write(f"data: {message}\n\n")
+                await self.flush()
+        except StreamClosedError:
+            pass
+        finally:
+            subscribers.discard(queue)
+
+
+def make_app():
+    app = tornado.web.Application(
+        [
+            (r"/", IndexHandler),
+            (r"/params", ParamsHandler),
+            (r"/control/(reset|pause|resume)", ControlHandler),
+            (r"/events", EventsHandler),
+        ],
+        template_path=os.path.dirname(os.path.abspath(__file__)),
+    )
+    app.runner = SimulationRunner(tornado.ioloop.IOLoop.current())
+    return app
+
+
+async def main():
+    app = make_app()
+
+    # Critical for Render/Heroku/etc.
+    port = int(os.environ.get("PORT", 8521))
+    app.listen(port)
+    app.runner.start()
+    print(f"Serving on http://127.0.0.1:{port}")
+    await asyncio.Event().wait()
+
 
-# Real-time chart (same as before)
-chart = ChartModule(
-    [
-        {"Label": "Avg_Wait_Time", "Color": "#FF0000"},
-        {"Label": "Avg_Satisfaction", "Color": "#00FF00"},
-        {"Label": "Crowding", "Color": "#0000FF"},
-    ],
-    data_collector_name="datacollector",
-)
-
-# INTERACTIVE PARAMETERS — this is the magic!
-model_params = {
-    "N_floors": Slider("Number of Floors", value=6, min_value=2, max_value=30, step=1),
-    "N_elevators": Slider("Number of Elevators", value=2, min_value=1, max_value=8, step=1),
-    "peak_hour": Checkbox("Peak Hour Demand (High Arrival Rate)", value=True),
-    "backup_power": Checkbox("Backup Power Available", value=True),
-    "door_time": Slider("Door Open/Close Time (s)", value=10.6, min_value=5.0, max_value=25.0, step=0.5),
-    "capacity": Slider("Elevator Capacity (persons)", value=16, min_value=8, max_value=30, step=1),
-    "vibration": Slider("Vibration Level", value=1.01, min_value=0.5, max_value=3.0, step=0.1),
-    "noise": Slider("Cabin Noise (dB)", value=55.9, min_value=40.0, max_value=80.0, step=1.0),
-    "speed": Slider("Elevator Speed (m/s)", value=3.0, min_value=1.0, max_value=6.0, step=0.5),
-}
-
-server = ModularServer(
-    BuildingModel,
-    [chart],
-    "VTS Hybrid ABM-DES — Interactive Simulation (Rowland PhD)",
-    model_params,                     
-)
-
-# Critical for Render/Heroku/etc.
-port = int(os.environ.get("PORT", 8521))
-server.port = port
-server.launch()
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(main())